@@ -13,12 +13,23 @@ from .config import (
     DATA_DIR,
     NUM_ZIPS_TO_INDEX,
     BATCH_SIZE,
+    BULK_CHUNK_SIZE,
+    BULK_MAX_CHUNK_BYTES,
+    BULK_THREAD_COUNT,
+    BULK_MAX_RETRIES,
+    BULK_INITIAL_BACKOFF,
+    BULK_MAX_BACKOFF,
+    USE_AUTOGEN_IDS,
     MAX_LIMIT,
     DEFAULT_SEARCH_SIZE,
 )
 from .mapping import MAPPING
-from .elasticsearch_client import create_es_client
-from .data_indexer import iter_jsons_in_path, bulk_index
+from .elasticsearch_client import (
+    create_es_client,
+    freeze_index_for_bulk,
+    thaw_index_after_bulk,
+)
+from .data_indexer import iter_jsons_in_path, bulk_index, suggest_chunk_size
 from .search import search_boolean_es, display_search_results
 
 __all__ = [
@@ -29,12 +40,22 @@ __all__ = [
     'DATA_DIR',
     'NUM_ZIPS_TO_INDEX',
     'BATCH_SIZE',
+    'BULK_CHUNK_SIZE',
+    'BULK_MAX_CHUNK_BYTES',
+    'BULK_THREAD_COUNT',
+    'BULK_MAX_RETRIES',
+    'BULK_INITIAL_BACKOFF',
+    'BULK_MAX_BACKOFF',
+    'USE_AUTOGEN_IDS',
     'MAX_LIMIT',
     'DEFAULT_SEARCH_SIZE',
     'MAPPING',
     'create_es_client',
+    'freeze_index_for_bulk',
+    'thaw_index_after_bulk',
     'iter_jsons_in_path',
     'bulk_index',
+    'suggest_chunk_size',
     'search_boolean_es',
     'display_search_results',
 ]
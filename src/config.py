@@ -3,12 +3,17 @@ Configuration module for Elasticsearch News Indexing project.
 Centralizes all configuration constants used across the project.
 """
 
+import os
 from pathlib import Path
 
 # Elasticsearch Configuration
 ES_HOST = 'http://127.0.0.1'
 ES_PORT = '9200'
 ES_URL = f"{ES_HOST}:{ES_PORT}"
+ES_HTTP_COMPRESS = True  # gzip request bodies (large win on _bulk)
+ES_CONNECTIONS_PER_NODE = 16  # Keep-alive pool size; keep >= BULK_THREAD_COUNT
+ES_REQUEST_TIMEOUT = 120  # Seconds; bulk requests can be slow under load
+ES_MAX_RETRIES = 3
 
 # Index Configuration
 INDEX_NAME = 'esindex-v1.0'
@@ -16,8 +21,20 @@ INDEX_NAME = 'esindex-v1.0'
 # Data Processing Configuration
 DATA_DIR = Path('free-news-datasets/News_Datasets')
 NUM_ZIPS_TO_INDEX = 5000  # Change this to index more/fewer archives
-BATCH_SIZE = 500
 MAX_LIMIT = 2e6  # Maximum documents to index
+IO_BUFFER_SIZE = 256 * 1024  # Buffered reader size for JSON files
+READ_BUFFER_SIZE = 1024 * 1024  # Initial size of the reusable parse buffer
+PARSE_WORKERS = os.cpu_count() or 1  # Threads reading/parsing JSON files
+
+# Bulk Indexing Configuration
+BULK_CHUNK_SIZE = 1000  # Documents per bulk request
+BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024  # Upper bound on a single bulk request body
+BULK_THREAD_COUNT = 8  # Threads sending bulk requests concurrently
+BULK_MAX_RETRIES = 3  # Retries for documents rejected with 429
+BULK_INITIAL_BACKOFF = 2  # Seconds before the first retry, doubled each time
+BULK_MAX_BACKOFF = 60  # Upper bound in seconds on the retry wait
+BATCH_SIZE = BULK_CHUNK_SIZE
+USE_AUTOGEN_IDS = False  # Let Elasticsearch assign _id (faster, but re-runs duplicate docs)
 
 # Search Configuration
 DEFAULT_SEARCH_SIZE = 10
@@ -3,13 +3,279 @@ Data indexing module for Elasticsearch.
 Handles reading JSON files from various sources and bulk indexing to Elasticsearch.
 """
 
-import json
+import mmap
+import os
+import threading
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
+
+import orjson
 from elasticsearch import helpers
 
+from .config import (
+    BULK_CHUNK_SIZE,
+    BULK_MAX_CHUNK_BYTES,
+    BULK_THREAD_COUNT,
+    BULK_MAX_RETRIES,
+    BULK_INITIAL_BACKOFF,
+    BULK_MAX_BACKOFF,
+    USE_AUTOGEN_IDS,
+    IO_BUFFER_SIZE,
+    READ_BUFFER_SIZE,
+    PARSE_WORKERS,
+)
+
+# Per-thread reusable read buffers (see _thread_buffer)
+_local = threading.local()
+
+# Parsing thread pools shared across calls, keyed by worker count (see _shared_pool)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _loads(raw):
+    """
+    Parse raw JSON bytes with orjson.
+
+    orjson validates UTF-8 itself, so the bytes are only decoded in Python
+    when that fails; undecodable bytes are then replaced rather than
+    reinterpreted, keeping the valid UTF-8 text in the file intact.
+
+    Args:
+        raw (bytes | memoryview): Raw file contents.
+
+    Returns:
+        Parsed JSON value.
+    """
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return orjson.loads(bytes(raw).decode('utf-8', 'replace'))
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only mmap usable as a seekable file object by zipfile.ZipFile."""
+
+    def seekable(self):
+        # mmap.mmap only gained seekable() in Python 3.13
+        return True
+
+
+def _thread_buffer():
+    """
+    Return the calling thread's reusable read buffer, creating it on first use.
+
+    Returns:
+        bytearray: Buffer owned by the current thread.
+    """
+    buf = getattr(_local, 'buf', None)
+    if buf is None:
+        buf = _local.buf = bytearray(READ_BUFFER_SIZE)
+    return buf
+
+
+def _read_json(fh, size, buf):
+    """
+    Read `size` bytes from `fh` into the reusable buffer `buf` and parse them.
+
+    The buffer is grown in place when a file is larger than it, so repeated
+    reads do not allocate a fresh bytes object per file. Only file objects
+    with a native readinto() benefit; zip members are read with read().
+
+    Args:
+        fh: Binary file object supporting readinto().
+        size (int): Number of bytes to read.
+        buf (bytearray): Reusable read buffer.
+
+    Returns:
+        Parsed JSON value.
+    """
+    if len(buf) < size:
+        buf.extend(bytes(size - len(buf)))
+    view = memoryview(buf)
+    try:
+        n = 0
+        while n < size:
+            got = fh.readinto(view[n:size])
+            if not got:
+                break
+            n += got
+        return _loads(view[:n])
+    finally:
+        view.release()
+
+
+def _extract(data, fallback_id):
+    """
+    Build the indexed document from a parsed news JSON.
+
+    Args:
+        data (dict): Parsed source JSON.
+        fallback_id (str): Identifier used when the JSON carries no uuid.
+
+    Returns:
+        tuple: (doc_id, doc) where doc holds 'uuid' plus the copied source fields.
+    """
+    get = data.get
+    doc_id = get('uuid') or get('thread', {}).get('uuid') or fallback_id
+    doc = {
+        'uuid': doc_id,
+        'title': get('title'),
+        'text': get('text'),
+        'author': get('author'),
+        'published': get('published'),
+        'language': get('language'),
+        'sentiment': get('sentiment'),
+        'categories': get('categories'),
+        'url': get('url')
+    }
+    return doc_id, doc
+
+
+def _iter_json_files(root):
+    """
+    Recursively yield the .json files under `root` using os.scandir.
+
+    Each directory is sorted on its own and descended into as it is reached,
+    so files come out in path order without listing the whole tree first.
+
+    Args:
+        root (Path | str): Directory to walk.
+
+    Yields:
+        os.DirEntry: Entry for each .json file found.
+    """
+    stack = [iter(_sorted_entries(root))]
+    while stack:
+        for entry in stack[-1]:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(iter(_sorted_entries(entry.path)))
+                break
+            if entry.name.endswith('.json'):
+                yield entry
+        else:
+            stack.pop()
+
+
+def _sorted_entries(path):
+    """
+    List a single directory with os.scandir, sorted by name.
+
+    A directory that cannot be read is reported and treated as empty, so
+    the rest of the walk carries on.
+
+    Args:
+        path (Path | str): Directory to list.
+
+    Returns:
+        list: os.DirEntry objects in the directory.
+    """
+    try:
+        with os.scandir(path) as it:
+            return sorted(it, key=attrgetter('name'))
+    except OSError as e:
+        print(f'Failed reading {path}: {e}')
+        return []
+
+
+def _load_file(p):
+    """
+    Read and parse a single JSON file.
+
+    Args:
+        p (os.PathLike | str): Path to the JSON file.
+
+    Returns:
+        Parsed JSON value.
+    """
+    with open(p, 'rb', buffering=IO_BUFFER_SIZE) as fh:
+        return _read_json(fh, os.fstat(fh.fileno()).st_size, _thread_buffer())
+
+
+def _load_member(zf, lock, info):
+    """
+    Read and parse a single JSON member of an open zip archive.
+
+    Only opening and closing the member are serialized; decompression and parsing run
+    concurrently across threads. ZipExtFile has no native readinto(), so the
+    member is read straight into bytes rather than through the reusable buffer.
+
+    Args:
+        zf (zipfile.ZipFile): Open archive.
+        lock (threading.Lock): Lock guarding zf.open() and member close().
+        info (zipfile.ZipInfo): Member to read.
+
+    Returns:
+        Parsed JSON value.
+    """
+    with lock:
+        fh = zf.open(info)
+    try:
+        return _loads(fh.read())
+    finally:
+        # Closing decrements the archive's shared file refcount, like open()
+        with lock:
+            fh.close()
+
+
+def _shared_pool(max_workers):
+    """
+    Return the process-wide parsing thread pool for `max_workers`, creating it on first use.
+
+    The pool outlives individual iter_jsons_in_path calls, so worker threads
+    and their reusable read buffers are kept across archives.
+
+    Args:
+        max_workers (int): Number of worker threads.
+
+    Returns:
+        ThreadPoolExecutor: Shared pool.
+    """
+    with _pools_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='json-parse')
+        return pool
+
+
+def _parallel_map(fn, items, max_workers):
+    """
+    Run `fn` over `items` on a thread pool, yielding (item, future) in input order.
+
+    At most 2 * max_workers tasks are in flight, so `items` is consumed lazily.
+    If the generator is closed early, queued tasks are cancelled and running
+    ones are waited for before it returns.
+
+    Args:
+        fn (callable): Function applied to each item.
+        items (iterable): Inputs to `fn`.
+        max_workers (int): Number of worker threads.
+
+    Yields:
+        tuple: (item, future) where future holds fn(item) or its exception.
+    """
+    pool = _shared_pool(max_workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, pool.submit(fn, item)))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        wait([future for _, future in pending])
+
 
-def iter_jsons_in_path(path: Path):
+def iter_jsons_in_path(path: Path, max_workers=PARSE_WORKERS):
     """
     Yield (doc_id, doc) for JSONs found inside a directory, a zip file, or a single JSON file.
     
@@ -19,125 +285,218 @@ def iter_jsons_in_path(path: Path):
     
     Args:
         path (Path): Path to directory, zip file, or JSON file.
+        max_workers (int): Number of threads reading and parsing files
+            concurrently. Documents are still yielded in file order.
         
     Yields:
         tuple: (doc_id, doc) where doc_id is unique identifier and doc is the document dict.
     """
     if path.is_dir():
         # walk directory for json files
-        for p in sorted(path.rglob('*.json')):
+        for entry, future in _parallel_map(_load_file, _iter_json_files(path), max_workers):
             try:
-                with open(p, 'rb') as fh:
-                    raw = fh.read()
-                    try:
-                        s = raw.decode('utf-8')
-                    except Exception:
-                        s = raw.decode('latin-1')
-                    data = json.loads(s)
-                    doc_id = data.get('uuid') or data.get('thread', {}).get('uuid') or f"{path.name}/{p.name}"
-                    doc = {
-                        'uuid': doc_id,
-                        'title': data.get('title'),
-                        'text': data.get('text'),
-                        'author': data.get('author'),
-                        'published': data.get('published'),
-                        'language': data.get('language'),
-                        'sentiment': data.get('sentiment'),
-                        'categories': data.get('categories'),
-                        'url': data.get('url')
-                    }
-                    yield doc_id, doc
+                yield _extract(future.result(), f"{path.name}/{entry.name}")
             except Exception as e:
-                print(f'Failed reading {p}: {e}')
+                print(f'Failed reading {entry.path}: {e}')
     elif path.suffix.lower() == '.zip':
-        # Handle zip files
-        with zipfile.ZipFile(path, 'r') as zf:
-            for name in zf.namelist():
-                if not name.lower().endswith('.json'):
-                    continue
+        # Handle zip files; reading through an mmap lets the kernel page
+        # archive bytes in directly instead of copying them through read()
+        with open(path, 'rb') as f, \
+                _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                zipfile.ZipFile(mm, 'r') as zf:
+            members = [info for info in zf.infolist() if info.filename.lower().endswith('.json')]
+            load = partial(_load_member, zf, threading.Lock())
+            for info, future in _parallel_map(load, members, max_workers):
+                name = info.filename
                 try:
-                    with zf.open(name) as fh:
-                        raw = fh.read()
-                        try:
-                            s = raw.decode('utf-8')
-                        except Exception:
-                            s = raw.decode('latin-1')
-                        data = json.loads(s)
-                        doc_id = data.get('uuid') or data.get('thread', {}).get('uuid') or f"{path.stem}/{name}"
-                        doc = {
-                            'uuid': doc_id,
-                            'title': data.get('title'),
-                            'text': data.get('text'),
-                            'author': data.get('author'),
-                            'published': data.get('published'),
-                            'language': data.get('language'),
-                            'sentiment': data.get('sentiment'),
-                            'categories': data.get('categories'),
-                            'url': data.get('url')
-                        }
-                        yield doc_id, doc
+                    yield _extract(future.result(), f"{path.stem}/{name}")
                 except Exception as e:
                     print(f'Failed reading {name} in {path}: {e}')
     elif path.is_file() and path.suffix.lower() == '.json':
         # Handle single JSON file
         try:
-            with open(path, 'rb') as fh:
-                raw = fh.read()
-                try:
-                    s = raw.decode('utf-8')
-                except Exception:
-                    s = raw.decode('latin-1')
-                data = json.loads(s)
-                doc_id = data.get('uuid') or data.get('thread', {}).get('uuid') or path.name
-                doc = {
-                    'uuid': doc_id,
-                    'title': data.get('title'),
-                    'text': data.get('text'),
-                    'author': data.get('author'),
-                    'published': data.get('published'),
-                    'language': data.get('language'),
-                    'sentiment': data.get('sentiment'),
-                    'categories': data.get('categories'),
-                    'url': data.get('url')
-                }
-                yield doc_id, doc
+            yield _extract(_load_file(path), path.name)
         except Exception as e:
             print(f'Failed reading {path}: {e}')
     else:
         print(f'Skipping unsupported path type: {path}')
 
 
-def bulk_index(es_client, index_name, docs_iter, batch_size=500):
+def suggest_chunk_size(avg_doc_size, max_bytes=BULK_MAX_CHUNK_BYTES):
     """
-    Bulk index documents to Elasticsearch.
+    Suggest how many documents fit in one bulk request of at most `max_bytes`.
     
     Args:
-        es_client (Elasticsearch): Elasticsearch client instance.
-        index_name (str): Name of the index to bulk index into.
-        docs_iter (iterator): Iterator of (doc_id, doc) tuples.
-        batch_size (int): Number of documents to process per batch.
+        avg_doc_size (int): Average serialized document size in bytes.
+        max_bytes (int): Maximum size in bytes of a single bulk request.
         
     Returns:
-        int: Total number of documents indexed.
+        int: Number of documents per bulk request (at least 1).
     """
-    actions = []
-    total = 0
-    
+    return max(1, max_bytes // max(1, avg_doc_size))
+
+
+def _actions_gen(docs_iter, index_name, use_autogen_ids=False):
+    """
+    Lazily turn (doc_id, doc) tuples into bulk index actions.
+
+    The `_source` is serialized here with orjson; the bulk helpers forward
+    bytes bodies verbatim instead of running them through the client's
+    JSON serializer.
+
+    Args:
+        docs_iter (iterator): Iterator of (doc_id, doc) tuples.
+        index_name (str): Name of the index the actions target.
+        use_autogen_ids (bool): Omit `_id` so Elasticsearch assigns one.
+
+    Yields:
+        dict: Bulk action for a single document.
+    """
+    dumps = orjson.dumps
     for doc_id, doc in docs_iter:
-        actions.append({
+        action = {
             '_index': index_name,
-            '_id': doc_id,
-            '_source': doc
-        })
-        
-        if len(actions) >= batch_size:
-            helpers.bulk(es_client, actions)
-            total += len(actions)
-            actions = []
+            '_source': dumps(doc)
+        }
+        if not use_autogen_ids:
+            action['_id'] = doc_id
+        yield action
+
+
+def _locked_iter(it, lock, stop):
+    """
+    Yield from `it`, taking `lock` around each step so several threads can share it.
+
+    Args:
+        it (iterator): Shared iterator.
+        lock (threading.Lock): Lock guarding next(it).
+        stop (threading.Event): Once set, no further items are handed out.
+
+    Yields:
+        Items of `it`, each handed to exactly one consumer.
+    """
+    while not stop.is_set():
+        with lock:
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+        yield item
+
+
+def _chunked(it, size):
+    """
+    Group the items of `it` into lists of `size` (the last one may be shorter).
+
+    Args:
+        it (iterable): Items to group.
+        size (int): Items per list.
+
+    Yields:
+        list: Consecutive items of `it`.
+    """
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _bulk_worker(es_client, chunks, stop, **kwargs):
+    """
+    Send each chunk of actions with helpers.streaming_bulk and count the outcomes.
+
+    If sending raises, `stop` is set before the exception propagates so the
+    other workers stop taking chunks.
+
+    Args:
+        es_client (Elasticsearch): Elasticsearch client instance.
+        chunks (iterator): Lists of bulk actions, one bulk request each.
+        stop (threading.Event): Shared flag telling all workers to stop.
+        **kwargs: Passed through to helpers.streaming_bulk.
+
+    Returns:
+        tuple: (indexed, failed) document counts.
+    """
+    indexed = 0
+    failed = 0
+    try:
+        for chunk in chunks:
+            for ok, _ in helpers.streaming_bulk(es_client, chunk, **kwargs):
+                if ok:
+                    indexed += 1
+                else:
+                    failed += 1
+    except BaseException:
+        stop.set()
+        raise
+    return indexed, failed
+
+
+def bulk_index(es_client, index_name, docs_iter, batch_size=BULK_CHUNK_SIZE,
+               thread_count=BULK_THREAD_COUNT, max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+               max_retries=BULK_MAX_RETRIES, initial_backoff=BULK_INITIAL_BACKOFF,
+               max_backoff=BULK_MAX_BACKOFF, use_autogen_ids=USE_AUTOGEN_IDS):
+    """
+    Bulk index documents to Elasticsearch using parallel bulk requests.
     
-    # Index remaining documents
-    if actions:
-        helpers.bulk(es_client, actions)
-        total += len(actions)
+    The action stream is cut into `batch_size` chunks that the sending
+    threads take in turn, so every request but the last is full. Each chunk
+    goes through helpers.streaming_bulk, so documents rejected with 429
+    (Too Many Requests) are retried with exponential backoff while the
+    other threads keep sending.
+    Per-document failures do not abort the load; they are counted instead.
+    A transport-level error that escapes streaming_bulk (e.g. ConnectionTimeout
+    once the client's own retries are used up) stops all threads from taking
+    further chunks and is re-raised, so the load fails fast.
     
-    return total
+    Args:
+        es_client (Elasticsearch): Elasticsearch client instance.
+        index_name (str): Name of the index to bulk index into.
+        docs_iter (iterator): Iterator of (doc_id, doc) tuples.
+        batch_size (int): Number of documents per bulk request. See
+            `suggest_chunk_size` to derive it from the average document size.
+        thread_count (int): Number of threads sending bulk requests.
+        max_chunk_bytes (int): Maximum size in bytes of a single bulk request.
+        max_retries (int): Times a document rejected with 429 is retried.
+        initial_backoff (float): Seconds to wait before the first retry;
+            doubled on each further retry.
+        max_backoff (float): Upper bound in seconds on the retry wait.
+        use_autogen_ids (bool): Let Elasticsearch generate document IDs instead
+            of using doc_id. This skips the per-document version lookup and is
+            faster, but re-indexing the same data creates duplicates rather
+            than overwriting; dedupe on the `uuid` keyword field instead.
+            Transport retries on timeout are turned off in this mode, since a
+            timed-out request may already have been applied and re-sending
+            it would duplicate its documents; a timeout is raised instead.
+        
+    Returns:
+        tuple: (total, error_count) numbers of documents indexed and failed.
+    """
+    if use_autogen_ids:
+        es_client = es_client.options(retry_on_timeout=False)
+    chunks = _chunked(_actions_gen(docs_iter, index_name, use_autogen_ids), batch_size)
+    lock = threading.Lock()
+    stop = threading.Event()
+    send = partial(
+        _bulk_worker,
+        es_client,
+        stop=stop,
+        chunk_size=batch_size,
+        max_chunk_bytes=max_chunk_bytes,
+        max_retries=max_retries,
+        initial_backoff=initial_backoff,
+        max_backoff=max_backoff,
+        raise_on_error=False,
+        raise_on_exception=False,
+    )
+    # At most one chunk per thread is held, and results are only counted, so
+    # memory stays flat no matter how many documents are indexed
+    with ThreadPoolExecutor(max_workers=thread_count) as pool:
+        futures = [pool.submit(send, _locked_iter(chunks, lock, stop)) for _ in range(thread_count)]
+        counts = [future.result() for future in futures]
+
+    total = sum(indexed for indexed, _ in counts)
+    error_count = sum(failed for _, failed in counts)
+    return total, error_count
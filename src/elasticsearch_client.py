@@ -4,20 +4,37 @@ Handles connection to Elasticsearch server.
 """
 
 from elasticsearch import Elasticsearch
-from .config import ES_URL
+from .config import (
+    ES_URL,
+    ES_HTTP_COMPRESS,
+    ES_CONNECTIONS_PER_NODE,
+    ES_REQUEST_TIMEOUT,
+    ES_MAX_RETRIES,
+    INDEX_NAME,
+)
 
 
 def create_es_client():
     """
     Create and test Elasticsearch client connection.
     
+    The client compresses request bodies, keeps a keep-alive connection pool
+    large enough for parallel bulk threads, and retries on timeouts.
+    
     Returns:
         Elasticsearch: Connected Elasticsearch client instance.
         
     Raises:
         Exception: If connection to Elasticsearch fails.
     """
-    es = Elasticsearch(ES_URL)
+    es = Elasticsearch(
+        ES_URL,
+        http_compress=ES_HTTP_COMPRESS,
+        connections_per_node=ES_CONNECTIONS_PER_NODE,
+        request_timeout=ES_REQUEST_TIMEOUT,
+        retry_on_timeout=True,
+        max_retries=ES_MAX_RETRIES,
+    )
     
     try:
         print(f'Connecting to Elasticsearch at {ES_URL}')
@@ -29,3 +46,41 @@ def create_es_client():
     except Exception as e:
         print(f'✗ Error connecting to Elasticsearch: {e}')
         raise
+
+
+def freeze_index_for_bulk(es, index_name=INDEX_NAME):
+    """
+    Disable refreshes and replicas on an index before a bulk load.
+    
+    Args:
+        es (Elasticsearch): Elasticsearch client instance.
+        index_name (str): Name of the index to prepare.
+    """
+    es.indices.put_settings(index=index_name, settings={
+        "index": {
+            "refresh_interval": "-1",
+            "number_of_replicas": 0,
+            "translog": {"durability": "async"}
+        }
+    })
+
+
+def thaw_index_after_bulk(es, index_name=INDEX_NAME):
+    """
+    Restore search-time refresh, replica and translog settings after a bulk load.
+    
+    This also resets the enlarged translog flush threshold that MAPPING
+    sets at index creation, so call it after the first load into a new index.
+    
+    Args:
+        es (Elasticsearch): Elasticsearch client instance.
+        index_name (str): Name of the index to restore.
+    """
+    es.indices.put_settings(index=index_name, settings={
+        "index": {
+            "refresh_interval": "30s",
+            "number_of_replicas": 1,
+            "translog": {"durability": "request", "flush_threshold_size": None}
+        }
+    })
+    es.indices.refresh(index=index_name)
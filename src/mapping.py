@@ -5,28 +5,27 @@ Defines the schema, analyzers, and field mappings.
 
 MAPPING = {
     "settings": {
+        # Bulk-load friendly defaults; restored by thaw_index_after_bulk()
+        "index": {
+            "refresh_interval": "-1",
+            "number_of_replicas": 0,
+            "translog": {"durability": "async", "flush_threshold_size": "1gb"}
+        },
         "analysis": {
             "filter": {
                 # English stemmer
-                "my_stemmer": {"type": "stemmer", "language": "english"},
-                # Create bigrams/trigrams for phrase search
-                "my_shingle_filter": {
-                    "type": "shingle",
-                    "min_shingle_size": 2,
-                    "max_shingle_size": 3,
-                    "output_unigrams": True
-                }
+                "my_stemmer": {"type": "stemmer", "language": "english"}
             },
             "analyzer": {
                 "my_analyzer": {
                     "type": "custom",
                     "tokenizer": "standard",
                     "char_filter": ["html_strip"],
-                    # Normalize, clean, stem, and create shingles
+                    # Normalize, clean, and stem
                     "filter": [
                         "lowercase", "stop", "apostrophe",
                         "decimal_digit", "trim",
-                        "my_stemmer", "my_shingle_filter"
+                        "my_stemmer"
                     ]
                 }
             }
@@ -35,8 +34,9 @@ MAPPING = {
     "mappings": {
         "properties": {
             "uuid": {"type": "keyword"},  # unique ID
-            "title": {"type": "text", "analyzer": "my_analyzer", "search_analyzer": "my_analyzer"},
-            "text": {"type": "text", "analyzer": "my_analyzer", "search_analyzer": "my_analyzer"},
+            # index_phrases adds a compact 2-gram subfield used by phrase queries
+            "title": {"type": "text", "analyzer": "my_analyzer", "search_analyzer": "my_analyzer", "index_phrases": True},
+            "text": {"type": "text", "analyzer": "my_analyzer", "search_analyzer": "my_analyzer", "index_phrases": True},
             "author": {"type": "keyword"},  # exact match
             "published": {"type": "date", "format": "strict_date_optional_time||epoch_millis"},
             "language": {"type": "keyword"},
@@ -3,13 +3,105 @@ Search module for executing queries on Elasticsearch index.
 Provides boolean/query_string search functionality.
 """
 
+import io
+import re
+import sys
+from functools import lru_cache
+
 from .config import INDEX_NAME, DEFAULT_SEARCH_SIZE
 
+# Fields searched by search_boolean_es
+_SEARCH_FIELDS = ("title", "text", "author", "language", "url", "categories")
+
+# Fields returned per hit; the article body is only fetched as a highlight snippet
+_SOURCE_FIELDS = ["uuid", "title", "author", "published", "language", "url", "categories"]
+
+# Operators and syntax that need the full query_string parser
+_QUERY_SYNTAX = re.compile(r'\b(?:AND|OR|NOT)\b|&&|\|\||[-+:()"*?~^!\[\]{}/\\]')
+
+# Length of the text highlight shown as each hit's snippet
+_SNIPPET_SIZE = 200
+
+# Shared defaults for hits without a text highlight
+_NO_HIGHLIGHT = {}
+_NO_FRAGMENT = ('',)
+
+# Quoted phrases, sent as phrase queries when nothing else needs query_string
+_PHRASE = re.compile(r'"([^"]+)"')
+
+
+@lru_cache(maxsize=1024)
+def _build_query_body(query_text, size):
+    """
+    Build (and cache) the search request body for a query.
+    
+    Plain keyword queries use a multi_match, which is cheaper to parse than
+    query_string, and quoted phrases become phrase queries served from the
+    index_phrases subfield; as with query_string, a hit needs to match only
+    one phrase or term. Anything else with boolean operators or query syntax
+    falls back to query_string. Only the fields shown by
+    display_search_results are fetched, with a short highlight fragment
+    standing in for the full text.
+    The returned dict is shared between calls and must not be modified.
+    
+    Args:
+        query_text (str): User query.
+        size (int): Number of results to return.
+        
+    Returns:
+        dict: Search request body.
+    """
+    phrases = _PHRASE.findall(query_text)
+    rest = _PHRASE.sub(' ', query_text).strip()
+    if phrases and not _QUERY_SYNTAX.search(rest):
+        # Any clause may match, like query_string's default OR operator
+        should = [
+            {"multi_match": {"query": phrase, "fields": list(_SEARCH_FIELDS), "type": "phrase"}}
+            for phrase in phrases
+        ]
+        if rest:
+            should.append({
+                "multi_match": {"query": rest, "fields": list(_SEARCH_FIELDS), "type": "best_fields"}
+            })
+        query = {"bool": {"should": should, "minimum_should_match": 1}}
+    elif _QUERY_SYNTAX.search(query_text):
+        query = {
+            "query_string": {
+                "query": query_text,
+                "fields": list(_SEARCH_FIELDS)
+            }
+        }
+    else:
+        query = {
+            "multi_match": {
+                "query": query_text,
+                "fields": list(_SEARCH_FIELDS),
+                "type": "best_fields"
+            }
+        }
+    return {
+        "query": query,
+        "size": size,
+        "_source": _SOURCE_FIELDS,
+        "highlight": {
+            "pre_tags": [""],
+            "post_tags": [""],
+            "fields": {
+                "text": {
+                    "fragment_size": _SNIPPET_SIZE,
+                    "number_of_fragments": 1,
+                    "no_match_size": _SNIPPET_SIZE
+                }
+            }
+        }
+    }
+
 
 def search_boolean_es(es_client, query_text, index_name=INDEX_NAME, size=DEFAULT_SEARCH_SIZE):
     """
     Execute a boolean/query_string search on multiple fields in Elasticsearch
-    and return results.
+    and return results. Queries without boolean operators or query syntax
+    are sent as a multi_match instead, and quoted phrases as phrase queries.
     
     Args:
         es_client (Elasticsearch): Elasticsearch client instance.
@@ -21,25 +113,11 @@ def search_boolean_es(es_client, query_text, index_name=INDEX_NAME, size=DEFAULT
         dict: Search results from Elasticsearch.
     """
     try:
-        # Multi-field query_string query
-        query_body = {
-            "query": {
-                "query_string": {
-                    "query": query_text,
-                    "fields": [
-                        "title",
-                        "text",
-                        "author",
-                        "language",
-                        "url",
-                        "categories"
-                    ]
-                }
-            }
-        }
+        # Multi-field multi_match / query_string query
+        query_body = _build_query_body(query_text, size)
 
         # Execute search
-        res = es_client.search(index=index_name, body=query_body, size=size)
+        res = es_client.search(index=index_name, body=query_body)
         return res
 
     except Exception as e:
@@ -51,6 +129,8 @@ def display_search_results(search_results, query_text=""):
     """
     Display formatted search results.
     
+    The whole report is assembled in memory and written to stdout at once.
+    
     Args:
         search_results (dict): Search results from Elasticsearch.
         query_text (str): Original query text for display.
@@ -62,23 +142,28 @@ def display_search_results(search_results, query_text=""):
     # Total hits
     total = search_results['hits']['total']['value'] if isinstance(search_results['hits']['total'], dict) else search_results['hits']['total']
     
-    print(f"\n{'='*70}")
-    print(f"Query: {query_text}")
-    print(f"Total hits: {total}")
-    print(f"{'='*70}\n")
+    rule = '=' * 70
+    divider = '-' * 70
+    buf = io.StringIO()
+    buf.write(f"\n{rule}\nQuery: {query_text}\nTotal hits: {total}\n{rule}\n\n")
 
-    # Display each hit nicely
+    # Display each hit nicely; the snippet is a highlight excerpt, and its
+    # length does not tell whether the text was cut, so it is always marked
     for i, hit in enumerate(search_results['hits']['hits'], 1):
-        print(f"Result #{i}")
-        print(f"Score : {hit['_score']}")
-        print(f"ID    : {hit['_id']}")
-        print(f"Title : {hit['_source'].get('title', '(no title)')}")
-        text = hit['_source'].get('text', '')
-        snippet = text[:200] + ("..." if len(text) > 200 else "")
-        print(f"Snippet:\n{snippet}")
-        print(f"Author: {hit['_source'].get('author', '(no author)')}")
-        print(f"Published: {hit['_source'].get('published', '(no date)')}")
-        print(f"Language: {hit['_source'].get('language', '(no language)')}")
-        print(f"URL: {hit['_source'].get('url', '(no url)')}")
-        print(f"Categories: {hit['_source'].get('categories', '(no categories)')}")
-        print(f"{'-'*70}\n")
+        get = hit['_source'].get
+        fragment = hit.get('highlight', _NO_HIGHLIGHT).get('text', _NO_FRAGMENT)[0]
+        buf.write(
+            f"Result #{i}\n"
+            f"Score : {hit['_score']}\n"
+            f"ID    : {hit['_id']}\n"
+            f"Title : {get('title', '(no title)')}\n"
+            f"Snippet:\n{fragment}{'...' if fragment else ''}\n"
+            f"Author: {get('author', '(no author)')}\n"
+            f"Published: {get('published', '(no date)')}\n"
+            f"Language: {get('language', '(no language)')}\n"
+            f"URL: {get('url', '(no url)')}\n"
+            f"Categories: {get('categories', '(no categories)')}\n"
+            f"{divider}\n\n"
+        )
+
+    sys.stdout.write(buf.getvalue())